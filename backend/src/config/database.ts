@@ -104,6 +104,20 @@ export interface Product {
   product_picture_7?: string;
   product_picture_8?: string;
   
+  // Abgeleitete Spalten (beim Import berechnet, siehe scripts/derived_specs.py)
+  cct_values?: number[];
+  cct_min?: number;
+  cct_max?: number;
+  cct_switchable?: boolean;
+  is_dim_to_warm?: boolean;
+  beam_angle_min?: number;
+  beam_angle_max?: number;
+  bbox_length_mm?: number;
+  bbox_width_mm?: number;
+  bbox_height_mm?: number;
+  max_dimension_mm?: number;
+  size_category?: string;
+  
   // System-Felder
   availability?: boolean;
   created_at?: string;
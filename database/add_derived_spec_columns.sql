@@ -0,0 +1,37 @@
+-- Fügt abgeleitete Spezifikations-Spalten zur products Tabelle hinzu
+-- Werden beim Excel-Import einmalig berechnet (scripts/derived_specs.py),
+-- damit CCT-, Winkel- und Größenfilter per Index statt per Parsing laufen
+
+ALTER TABLE products
+ADD COLUMN IF NOT EXISTS cct_values INTEGER[],
+ADD COLUMN IF NOT EXISTS cct_min INTEGER,
+ADD COLUMN IF NOT EXISTS cct_max INTEGER,
+ADD COLUMN IF NOT EXISTS cct_switchable BOOLEAN DEFAULT false,
+ADD COLUMN IF NOT EXISTS is_dim_to_warm BOOLEAN DEFAULT false,
+ADD COLUMN IF NOT EXISTS beam_angle_min NUMERIC(10,1),
+ADD COLUMN IF NOT EXISTS beam_angle_max NUMERIC(10,1),
+ADD COLUMN IF NOT EXISTS bbox_length_mm NUMERIC(10,1),
+ADD COLUMN IF NOT EXISTS bbox_width_mm NUMERIC(10,1),
+ADD COLUMN IF NOT EXISTS bbox_height_mm NUMERIC(10,1),
+ADD COLUMN IF NOT EXISTS max_dimension_mm NUMERIC(10,1),
+ADD COLUMN IF NOT EXISTS size_category TEXT;
+
+-- CCT: Enthalten-Abfragen (cct_values @> ARRAY[2700]) und Bereiche
+CREATE INDEX IF NOT EXISTS idx_products_cct_values ON products USING gin(cct_values);
+CREATE INDEX IF NOT EXISTS idx_products_cct_range ON products(cct_min, cct_max);
+CREATE INDEX IF NOT EXISTS idx_products_cct_switchable ON products(cct_switchable) WHERE cct_switchable;
+CREATE INDEX IF NOT EXISTS idx_products_is_dim_to_warm ON products(is_dim_to_warm) WHERE is_dim_to_warm;
+
+-- Abstrahlwinkel-Bereich
+CREATE INDEX IF NOT EXISTS idx_products_beam_angle_range ON products(beam_angle_min, beam_angle_max);
+
+-- Abmessungen und Größenkategorie (klein / mittelgroß / groß)
+CREATE INDEX IF NOT EXISTS idx_products_max_dimension_mm ON products(max_dimension_mm);
+CREATE INDEX IF NOT EXISTS idx_products_size_category ON products(size_category);
+
+-- Lichtausbeute
+CREATE INDEX IF NOT EXISTS idx_products_lumen_per_watt ON products(lumen_per_watt);
+
+COMMENT ON COLUMN products.cct_values IS 'Alle wählbaren Farbtemperaturen in Kelvin (aus cct und cct_switch_value)';
+COMMENT ON COLUMN products.is_dim_to_warm IS 'Dim-to-Warm Produkt (z.B. CCT-Switch 1800-3000)';
+COMMENT ON COLUMN products.max_dimension_mm IS 'Größte Abmessung in mm (Basis für size_category)';
@@ -10,6 +10,8 @@ from datetime import datetime
 import numpy as np
 import sys
 from dotenv import load_dotenv
+from import_journal import discard_journal
+from profiling import profile_requested, enable_profiling, profile_stage
 
 # Lade .env Datei
 load_dotenv()
@@ -27,6 +29,8 @@ if not SUPABASE_URL or not SUPABASE_KEY:
     sys.exit(1)
 
 def main():
+    if profile_requested():
+        enable_profiling('clear_and_reimport')
     try:
         print("🧹 Lösche alle Produktdaten und starte Neuimport...")
         
@@ -36,16 +40,18 @@ def main():
         
         # 1. Alle Produktdaten löschen
         print("🗑️ Lösche alle vorhandenen Produktdaten...")
-        try:
-            result = supabase.table('products').delete().neq('id', 0).execute()
-            print("✅ Alle Produktdaten gelöscht")
-        except Exception as e:
-            print(f"⚠️ Warnung beim Löschen: {e}")
+        with profile_stage('delete'):
+            try:
+                result = supabase.table('products').delete().neq('id', 0).execute()
+                print("✅ Alle Produktdaten gelöscht")
+            except Exception as e:
+                print(f"⚠️ Warnung beim Löschen: {e}")
         
         # 2. Zähle verbleibende Einträge
-        result = supabase.table('products').select('count', count='exact').execute()
-        remaining_count = result.count if result.count else 0
-        print(f"📊 Verbleibende Produkte in DB: {remaining_count}")
+        with profile_stage('count'):
+            result = supabase.table('products').select('count', count='exact').execute()
+            remaining_count = result.count if result.count else 0
+            print(f"📊 Verbleibende Produkte in DB: {remaining_count}")
         
         if remaining_count > 0:
             print("⚠️ Es sind noch Produkte in der Datenbank. Versuche nochmals zu löschen...")
@@ -56,6 +62,10 @@ def main():
             except Exception as e:
                 print(f"❌ Konnte nicht alle Produkte löschen: {e}")
         
+        # Journal verwerfen, sonst würde der Import einen alten Stand fortsetzen
+        if discard_journal():
+            print("✅ Import-Journal zurückgesetzt")
+        
         print("\n🎯 Datenbank ist bereit für Neuimport!")
         print("Führe jetzt aus: python3 import_excel_to_supabase.py")
         
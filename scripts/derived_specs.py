@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Abgeleitete Spezifikations-Spalten für die products-Tabelle
+Berechnet CCT-Liste, Dim-to-Warm, Abstrahlwinkel-Bereich, Hüllmaße und Lumen pro Watt
+einmalig beim Import, damit das Backend per Index filtern kann statt pro Anfrage zu parsen
+(siehe backend/src/utils/cctUtils.ts und dimensionUtils.ts)
+"""
+
+import math
+import re
+
+# Plausibler Bereich für Farbtemperaturen in Kelvin
+CCT_MIN_KELVIN = 1000
+CCT_MAX_KELVIN = 10000
+
+# Schwellenwerte wie SIZE_THRESHOLDS in dimensionUtils.ts
+SIZE_LARGE_MIN_MM = 500
+SIZE_MEDIUM_MIN_MM = 250
+
+# Dim-to-Warm Bereiche starten warm gedimmt (1800K, vgl. isDimToWarmRequested in cctUtils.ts);
+# Bereiche wie 2700-6500 sind Tunable White, 2700-3000 ein normaler CCT-Switch
+DIM_TO_WARM_MAX_START_KELVIN = 2200
+
+# Namensbestandteile, die auf Dim-to-Warm hinweisen (wie isDimToWarmRequested)
+DIM_TO_WARM_TERMS = ['dim to warm', 'dim-to-warm', 'dimtowarm', 'dim2warm', 'd2w']
+
+# Spalten aus database/add_derived_spec_columns.sql (lumen_per_watt existiert bereits im Basisschema)
+DERIVED_COLUMNS = [
+    'cct_values', 'cct_min', 'cct_max', 'cct_switchable', 'is_dim_to_warm',
+    'beam_angle_min', 'beam_angle_max',
+    'bbox_length_mm', 'bbox_width_mm', 'bbox_height_mm', 'max_dimension_mm', 'size_category',
+]
+
+_NUMBER_PATTERN = re.compile(r'\d+(?:[.,]\d+)?')
+
+
+def _is_missing(value):
+    """Prüft auf leere Werte (None, NaN, leerer String)"""
+    if value is None:
+        return True
+    if isinstance(value, float) and math.isnan(value):
+        return True
+    if isinstance(value, str) and value.strip().lower() in ['', 'nan', 'n/a', 'na', '-']:
+        return True
+    return False
+
+
+def _to_number(value):
+    """Konvertiert einen Einzelwert zu float oder None"""
+    if _is_missing(value):
+        return None
+    try:
+        return float(str(value).replace(',', '.'))
+    except (ValueError, TypeError):
+        return None
+
+
+def _extract_numbers(value):
+    """Extrahiert alle Zahlen aus einem Textfeld wie '2700/3000' oder '60/85/105'"""
+    if _is_missing(value):
+        return []
+    return [float(n.replace(',', '.')) for n in _NUMBER_PATTERN.findall(str(value))]
+
+
+def _compact(value):
+    """Gibt ganze Zahlen als int zurück, sonst float"""
+    if value is None:
+        return None
+    return int(value) if float(value).is_integer() else round(value, 1)
+
+
+def parse_cct_values(cct, cct_switch_value):
+    """
+    Ermittelt alle wählbaren CCT-Werte und ob es sich um Dim-to-Warm handelt
+
+    >>> parse_cct_values(None, '1800-3000')
+    ([1800, 3000], True)
+    >>> parse_cct_values(3000, '2700-6500')
+    ([2700, 3000, 6500], False)
+    >>> parse_cct_values(None, '2700-3000')
+    ([2700, 3000], False)
+    >>> parse_cct_values(None, '2700/3000/4000')
+    ([2700, 3000, 4000], False)
+    """
+    values = set()
+
+    cct_number = _to_number(cct)
+    if cct_number is not None:
+        values.add(int(cct_number))
+
+    is_dim_to_warm = False
+    if not _is_missing(cct_switch_value):
+        switch_text = str(cct_switch_value)
+        switch_numbers = [int(n) for n in _extract_numbers(switch_text)]
+        values.update(switch_numbers)
+        # Nur ein Bereich mit warm gedimmtem Start (1800-3000) ist Dim-to-Warm
+        if ('-' in switch_text and len(switch_numbers) == 2
+                and switch_numbers[0] <= DIM_TO_WARM_MAX_START_KELVIN < switch_numbers[1]):
+            is_dim_to_warm = True
+
+    values = sorted(v for v in values if CCT_MIN_KELVIN <= v <= CCT_MAX_KELVIN)
+    return values, is_dim_to_warm
+
+
+def parse_beam_angle_range(beam_angle, beam_angle_range):
+    """Ermittelt minimalen und maximalen Abstrahlwinkel in Grad"""
+    angles = _extract_numbers(beam_angle_range)
+    beam_angle_number = _to_number(beam_angle)
+    if beam_angle_number is not None:
+        angles.append(beam_angle_number)
+
+    if not angles:
+        return None, None
+    return _compact(min(angles)), _compact(max(angles))
+
+
+def get_size_category(max_dimension_mm):
+    """Größenkategorie wie getSizeCategory() in dimensionUtils.ts"""
+    if max_dimension_mm is None:
+        return 'mittelgroß'  # Default für unbekannte Größe
+    if max_dimension_mm > SIZE_LARGE_MIN_MM:
+        return 'groß'
+    if max_dimension_mm >= SIZE_MEDIUM_MIN_MM:
+        return 'mittelgroß'
+    return 'klein'
+
+
+def derive_bounding_dimensions(product):
+    """
+    Berechnet die Hüllmaße in mm
+    Bei runden Produkten ersetzt der Durchmesser fehlende Länge/Breite
+    """
+    length = _to_number(product.get('length_mm'))
+    width = _to_number(product.get('width_mm'))
+    height = _to_number(product.get('height_mm'))
+    diameter = _to_number(product.get('diameter_mm'))
+
+    bbox_length = length if length is not None else diameter
+    bbox_width = width if width is not None else diameter
+
+    dimensions = [d for d in [length, width, height, diameter] if d is not None]
+    max_dimension = max(dimensions) if dimensions else None
+
+    return {
+        'bbox_length_mm': _compact(bbox_length),
+        'bbox_width_mm': _compact(bbox_width),
+        'bbox_height_mm': _compact(height),
+        'max_dimension_mm': _compact(max_dimension),
+        'size_category': get_size_category(max_dimension),
+    }
+
+
+def derive_lumen_per_watt(product):
+    """Übernimmt lumen_per_watt oder berechnet ihn aus lumen / wattage"""
+    existing = _to_number(product.get('lumen_per_watt'))
+    if existing is not None:
+        return _compact(existing)
+
+    lumen = _to_number(product.get('lumen'))
+    wattage = _to_number(product.get('wattage'))
+    if lumen is None or not wattage:
+        return None
+    return _compact(round(lumen / wattage, 1))
+
+
+def derive_spec_columns(product):
+    """Berechnet alle abgeleiteten Spalten für ein bereits gemapptes Produkt"""
+    cct_values, is_dim_to_warm = parse_cct_values(product.get('cct'), product.get('cct_switch_value'))
+
+    name = str(product.get('vysn_name') or '').lower()
+    if any(term in name for term in DIM_TO_WARM_TERMS):
+        is_dim_to_warm = True
+
+    beam_angle_min, beam_angle_max = parse_beam_angle_range(
+        product.get('beam_angle'), product.get('beam_angle_range')
+    )
+
+    derived = {
+        'cct_values': cct_values or None,
+        'cct_min': cct_values[0] if cct_values else None,
+        'cct_max': cct_values[-1] if cct_values else None,
+        'cct_switchable': not _is_missing(product.get('cct_switch_value')),
+        'is_dim_to_warm': is_dim_to_warm,
+        'beam_angle_min': beam_angle_min,
+        'beam_angle_max': beam_angle_max,
+        'lumen_per_watt': derive_lumen_per_watt(product),
+    }
+    derived.update(derive_bounding_dimensions(product))
+    return derived
@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+Export der products-Tabelle nach Parquet oder CSV
+Lädt die Tabelle mit parallelen Range-Requests, schreibt die Seiten gestreamt mit festem Schema
+und kann inkrementell (nur seit dem letzten Export geänderte Zeilen per updated_at) aktualisieren.
+Andere Skripte lesen die Datei über read_export() als lokale, schreibgeschützte Quelle.
+
+Verwendung:
+    python3 export_products.py products.parquet
+    python3 export_products.py products.csv --columns id,item_number_vysn,vysn_name,gross_price
+    python3 export_products.py products.parquet --incremental
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+DEFAULT_PAGE_SIZE = 1000
+DEFAULT_WORKERS = 8
+# Parquet Row-Groups sammeln mehrere Seiten, damit die Datei kompakt bleibt
+PARQUET_ROW_GROUP_SIZE = 20000
+
+# Spaltentypen wie in supabase_schema_products_real.sql und den Migrationen
+PRODUCT_COLUMN_TYPES = {
+    'id': 'integer',
+    'vysn_name': 'text',
+    'item_number_vysn': 'text',
+    'short_description': 'text',
+    'long_description': 'text',
+    'weight_kg': 'numeric',
+    'packaging_weight_kg': 'numeric',
+    'gross_weight_kg': 'numeric',
+    'installation_diameter': 'numeric',
+    'cable_length_mm': 'numeric',
+    'diameter_mm': 'numeric',
+    'length_mm': 'numeric',
+    'width_mm': 'numeric',
+    'height_mm': 'numeric',
+    'packaging_width_mm': 'numeric',
+    'packaging_length_mm': 'numeric',
+    'packaging_height_mm': 'numeric',
+    'housing_color': 'text',
+    'material': 'text',
+    'gross_price': 'numeric',
+    'katalog_q4_24': 'boolean',
+    'category_1': 'text',
+    'category_2': 'text',
+    'group_name': 'text',
+    'light_direction': 'text',
+    'lumen': 'numeric',
+    'driver_info': 'text',
+    'beam_angle': 'numeric',
+    'beam_angle_range': 'text',
+    'lightsource': 'text',
+    'luminosity_decrease': 'text',
+    'steering': 'text',
+    'led_chip_lifetime': 'text',
+    'energy_class': 'text',
+    'cct': 'numeric',
+    'cri': 'numeric',
+    'wattage': 'numeric',
+    'led_type': 'text',
+    'sdcm': 'text',
+    'operating_mode': 'text',
+    'lumen_per_watt': 'numeric',
+    'cct_switch_value': 'text',
+    'power_switch_value': 'text',
+    'ingress_protection': 'text',
+    'protection_class': 'text',
+    'impact_resistance': 'text',
+    'ugr': 'numeric',
+    'installation': 'text',
+    'base_socket': 'text',
+    'number_of_sockets': 'numeric',
+    'socket_information_retrofit': 'text',
+    'replaceable_light_source': 'boolean',
+    'coverable': 'boolean',
+    'manual_link': 'text',
+    'barcode_number': 'text',
+    'hs_code': 'text',
+    'packaging_units': 'numeric',
+    'country_of_origin': 'text',
+    'eprel_link': 'text',
+    'eprel_picture_link': 'text',
+    'product_picture_1': 'text',
+    'product_picture_2': 'text',
+    'product_picture_3': 'text',
+    'product_picture_4': 'text',
+    'product_picture_5': 'text',
+    'product_picture_6': 'text',
+    'product_picture_7': 'text',
+    'product_picture_8': 'text',
+    'stock_quantity': 'integer',
+    'cct_values': 'integer[]',
+    'cct_min': 'integer',
+    'cct_max': 'integer',
+    'cct_switchable': 'boolean',
+    'is_dim_to_warm': 'boolean',
+    'beam_angle_min': 'numeric',
+    'beam_angle_max': 'numeric',
+    'bbox_length_mm': 'numeric',
+    'bbox_width_mm': 'numeric',
+    'bbox_height_mm': 'numeric',
+    'max_dimension_mm': 'numeric',
+    'size_category': 'text',
+    'availability': 'boolean',
+    'created_at': 'timestamp',
+    'updated_at': 'timestamp',
+}
+
+# Für inkrementelle Exporte immer benötigt (Zusammenführen per id, Wasserstand per updated_at)
+INCREMENTAL_KEY_COLUMNS = ['id', 'updated_at']
+
+
+def _state_path(output):
+    """Pfad der Statusdatei mit dem updated_at-Wasserstand eines Exports"""
+    return output + '.state.json'
+
+
+def _coerce(value, column_type):
+    """Bringt einen Wert aus der API oder CSV in den Python-Typ der Spalte"""
+    if value is None or value == '':
+        return None
+    if column_type == 'integer':
+        return int(float(value))
+    if column_type == 'numeric':
+        return float(value)
+    if column_type == 'boolean':
+        if isinstance(value, str):
+            return value.lower() in ['true', 't', '1']
+        return bool(value)
+    if column_type == 'integer[]':
+        if isinstance(value, str):
+            value = json.loads(value)
+        return [int(v) for v in value]
+    if column_type == 'timestamp' and isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _coerce_row(row, columns):
+    """Typisiert eine Zeile für die gewählten Spalten"""
+    return {column: _coerce(row.get(column), PRODUCT_COLUMN_TYPES[column]) for column in columns}
+
+
+def _create_supabase_client():
+    """Supabase-Client aus den Umgebungsvariablen (wie in den übrigen Skripten)"""
+    from dotenv import load_dotenv
+    from supabase import create_client
+
+    load_dotenv()
+    supabase_url = os.getenv('SUPABASE_URL')
+    supabase_key = (os.getenv('SUPABASE_SERVICE_ROLE') or
+                    os.getenv('SUPABASE_ANON_KEY') or
+                    os.getenv('SUPABASE_KEY'))
+    if not supabase_url or not supabase_key:
+        print("❌ Fehler: SUPABASE_URL und SUPABASE_KEY müssen als Umgebungsvariablen gesetzt sein")
+        sys.exit(1)
+    return create_client(supabase_url, supabase_key)
+
+
+def _filtered_query(client, columns, since, count=None):
+    """Basis-Query mit Projektion und optionalem updated_at-Filter"""
+    query = client.table('products').select(','.join(columns), count=count)
+    if since:
+        query = query.gt('updated_at', since)
+    return query
+
+
+def fetch_pages(columns, since=None, page_size=DEFAULT_PAGE_SIZE, workers=DEFAULT_WORKERS):
+    """
+    Lädt alle passenden Zeilen über parallele Range-Requests
+    Liefert die Seiten in id-Reihenfolge; höchstens 2 * workers Seiten liegen gleichzeitig im Speicher
+    """
+    local = threading.local()
+
+    def client():
+        # Eigener Client pro Thread, die HTTP-Sessions werden nicht geteilt
+        if not hasattr(local, 'client'):
+            local.client = _create_supabase_client()
+        return local.client
+
+    count_result = _filtered_query(client(), ['id'], since, count='exact').limit(1).execute()
+    total = count_result.count or 0
+
+    def fetch(offset):
+        result = _filtered_query(client(), columns, since) \
+            .order('id').range(offset, offset + page_size - 1).execute()
+        return result.data or []
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        offsets = iter(range(0, total, page_size))
+        for offset in offsets:
+            pending.append(executor.submit(fetch, offset))
+            if len(pending) >= workers * 2:
+                break
+        while pending:
+            page = pending.popleft().result()
+            next_offset = next(offsets, None)
+            if next_offset is not None:
+                pending.append(executor.submit(fetch, next_offset))
+            yield page
+
+
+class _CsvSink:
+    """Schreibt Seiten gestreamt als CSV (Arrays als JSON)"""
+
+    def __init__(self, path, columns):
+        self.columns = columns
+        self.file = open(path, 'w', newline='', encoding='utf-8')
+        self.writer = csv.DictWriter(self.file, fieldnames=columns)
+        self.writer.writeheader()
+
+    def write(self, rows):
+        for row in rows:
+            self.writer.writerow({
+                column: json.dumps(value) if isinstance(value, list) else value
+                for column, value in row.items()
+            })
+
+    def close(self):
+        self.file.close()
+
+
+def _arrow_schema(columns):
+    """pyarrow-Schema für die gewählten Spalten"""
+    import pyarrow as pa
+
+    arrow_types = {
+        'text': pa.string(),
+        'numeric': pa.float64(),
+        'integer': pa.int64(),
+        'boolean': pa.bool_(),
+        'integer[]': pa.list_(pa.int32()),
+        'timestamp': pa.timestamp('us', tz='UTC'),
+    }
+    return pa.schema([(column, arrow_types[PRODUCT_COLUMN_TYPES[column]]) for column in columns])
+
+
+class _ParquetSink:
+    """Schreibt Seiten gestreamt als Parquet, gepuffert zu Row-Groups"""
+
+    def __init__(self, path, columns):
+        import pyarrow.parquet as pq
+
+        self.columns = columns
+        self.schema = _arrow_schema(columns)
+        self.writer = pq.ParquetWriter(path, self.schema, compression='zstd')
+        self.buffer = []
+
+    def write(self, rows):
+        self.buffer.extend(rows)
+        if len(self.buffer) >= PARQUET_ROW_GROUP_SIZE:
+            self._flush()
+
+    def _flush(self):
+        import pyarrow as pa
+
+        if not self.buffer:
+            return
+        data = {column: [row[column] for row in self.buffer] for column in self.columns}
+        for column in self.columns:
+            if PRODUCT_COLUMN_TYPES[column] == 'timestamp':
+                data[column] = [datetime.fromisoformat(v) if v else None for v in data[column]]
+        self.writer.write_table(pa.Table.from_pydict(data, schema=self.schema))
+        self.buffer = []
+
+    def close(self):
+        self._flush()
+        self.writer.close()
+
+
+def _open_sink(path, columns):
+    """Wählt das Ausgabeformat anhand der Dateiendung"""
+    if path.endswith('.parquet'):
+        try:
+            return _ParquetSink(path, columns)
+        except ImportError:
+            print("❌ Fehler: Für Parquet-Export wird pyarrow benötigt (pip3 install pyarrow)")
+            sys.exit(1)
+    if path.endswith('.csv'):
+        return _CsvSink(path, columns)
+    raise ValueError(f"Unbekanntes Exportformat (erwartet .parquet oder .csv): {path}")
+
+
+def read_export(path, columns=None):
+    """
+    Liest einen Export als Liste typisierter Dicts, wie sie auch die Supabase-API liefert
+    Für Skripte, die den Katalog nur lesen und keine eigene Abfrage brauchen
+    """
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(path, columns=columns)
+        return [_coerce_row(row, table.column_names) for row in table.to_pylist()]
+
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        selected = columns or reader.fieldnames
+        return [_coerce_row(row, selected) for row in reader]
+
+
+def export_products(output, columns=None, since=None, page_size=DEFAULT_PAGE_SIZE, workers=DEFAULT_WORKERS):
+    """Exportiert die Tabelle nach output; gibt (Zeilenzahl, höchstes updated_at) zurück"""
+    columns = columns or list(PRODUCT_COLUMN_TYPES)
+    tmp_path = output + '.tmp' + os.path.splitext(output)[1]
+    sink = _open_sink(tmp_path, columns)
+    row_count = 0
+    watermark = since
+    try:
+        for page in fetch_pages(columns, since, page_size, workers):
+            rows = [_coerce_row(row, columns) for row in page]
+            sink.write(rows)
+            row_count += len(rows)
+            if 'updated_at' in columns:
+                watermark = max([watermark or ''] + [row['updated_at'] or '' for row in rows]) or None
+    finally:
+        sink.close()
+    os.replace(tmp_path, output)
+    return row_count, watermark
+
+
+def merge_incremental(output, columns, page_size=DEFAULT_PAGE_SIZE, workers=DEFAULT_WORKERS):
+    """
+    Aktualisiert einen bestehenden Export mit allen seit dem letzten Lauf geänderten Zeilen
+    Gelöschte Produkte werden dabei nicht erkannt, dafür ist ein voller Export nötig
+    Die Spaltenreihenfolge des bestehenden Exports bleibt erhalten; der Wasserstand wird fortgeschrieben
+    """
+    with open(_state_path(output), 'r', encoding='utf-8') as f:
+        state = json.load(f)
+    if set(state.get('columns') or []) != set(columns):
+        raise ValueError("Spaltenauswahl weicht vom bestehenden Export ab, bitte vollen Export ausführen")
+    columns = state['columns']
+
+    changed = {}
+    watermark = state['watermark']
+    for page in fetch_pages(columns, state['watermark'], page_size, workers):
+        for row in page:
+            row = _coerce_row(row, columns)
+            changed[row['id']] = row
+            watermark = max(watermark or '', row['updated_at'] or '') or None
+
+    changed_count = len(changed)
+    if changed:
+        rows = [changed.pop(row['id'], row) for row in read_export(output, columns)]
+        rows.extend(changed.values())
+        tmp_path = output + '.tmp' + os.path.splitext(output)[1]
+        sink = _open_sink(tmp_path, columns)
+        try:
+            sink.write(rows)
+        finally:
+            sink.close()
+        os.replace(tmp_path, output)
+    _save_state(output, columns, watermark)
+    return changed_count, watermark
+
+
+def _save_state(output, columns, watermark):
+    """Merkt Spaltenauswahl und updated_at-Wasserstand für den nächsten inkrementellen Lauf"""
+    with open(_state_path(output), 'w', encoding='utf-8') as f:
+        json.dump({'columns': columns, 'watermark': watermark,
+                   'exported_at': datetime.now().isoformat()}, f, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="products-Tabelle nach Parquet oder CSV exportieren")
+    parser.add_argument('output', help="Zieldatei (.parquet oder .csv)")
+    parser.add_argument('--columns', help="Kommagetrennte Spaltenauswahl (Standard: alle)")
+    parser.add_argument('--since', help="Nur Zeilen mit updated_at > SINCE (ISO-Zeitstempel)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Bestehenden Export mit seit dem letzten Lauf geänderten Zeilen aktualisieren")
+    parser.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE)
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    args = parser.parse_args()
+
+    columns = args.columns.split(',') if args.columns else list(PRODUCT_COLUMN_TYPES)
+    unknown = [column for column in columns if column not in PRODUCT_COLUMN_TYPES]
+    if unknown:
+        print(f"❌ Fehler: Unbekannte Spalten: {', '.join(unknown)}")
+        sys.exit(1)
+    if args.incremental:
+        columns = columns + [c for c in INCREMENTAL_KEY_COLUMNS if c not in columns]
+
+    start = time.perf_counter()
+    try:
+        if args.incremental and os.path.exists(args.output) and os.path.exists(_state_path(args.output)):
+            print(f"🔄 Aktualisiere {args.output} inkrementell...")
+            row_count, watermark = merge_incremental(args.output, columns, args.page_size, args.workers)
+            print(f"✅ {row_count} geänderte Produkte übernommen")
+        else:
+            print(f"📤 Exportiere products nach {args.output} ({len(columns)} Spalten, {args.workers} parallele Requests)...")
+            row_count, watermark = export_products(args.output, columns, args.since, args.page_size, args.workers)
+            print(f"✅ {row_count} Produkte exportiert")
+            if 'updated_at' in columns and not args.since:
+                _save_state(args.output, columns, watermark)
+    except Exception as e:
+        print(f"❌ Fehler: {e}")
+        sys.exit(1)
+
+    print(f"⏱️ Dauer: {time.perf_counter() - start:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,7 @@ Entfernt .0 am Ende von Barcode-Nummern (z.B. 4255805303931.0 -> 4255805303931)
 import os
 from supabase import create_client, Client
 from dotenv import load_dotenv
+from profiling import profile_requested, enable_profiling, profile_stage
 import sys
 
 # Lade .env Datei
@@ -37,6 +38,8 @@ def clean_barcode(barcode_value):
     return str_value
 
 def main():
+    if profile_requested():
+        enable_profiling('fix_barcode_numbers')
     try:
         print("🚀 Starte Barcode-Bereinigung...")
         
@@ -46,7 +49,8 @@ def main():
         
         # Alle Produkte mit Barcode-Nummern laden
         print("📖 Lade alle Produkte mit Barcode-Nummern...")
-        response = supabase.table('products').select('id, item_number_vysn, barcode_number').not_('barcode_number', 'is', None).execute()
+        with profile_stage('fetch'):
+            response = supabase.table('products').select('id, item_number_vysn, barcode_number').not_('barcode_number', 'is', None).execute()
         
         if not response.data:
             print("❌ Keine Produkte mit Barcode-Nummern gefunden")
@@ -56,17 +60,18 @@ def main():
         print(f"✅ {len(products)} Produkte mit Barcode-Nummern gefunden")
         
         # Finde Produkte mit .0 am Ende
-        products_to_fix = []
-        for product in products:
-            barcode = product.get('barcode_number')
-            if barcode and str(barcode).endswith('.0'):
-                cleaned_barcode = clean_barcode(barcode)
-                products_to_fix.append({
-                    'id': product['id'],
-                    'item_number': product['item_number_vysn'],
-                    'old_barcode': barcode,
-                    'new_barcode': cleaned_barcode
-                })
+        with profile_stage('match'):
+            products_to_fix = []
+            for product in products:
+                barcode = product.get('barcode_number')
+                if barcode and str(barcode).endswith('.0'):
+                    cleaned_barcode = clean_barcode(barcode)
+                    products_to_fix.append({
+                        'id': product['id'],
+                        'item_number': product['item_number_vysn'],
+                        'old_barcode': barcode,
+                        'new_barcode': cleaned_barcode
+                    })
         
         if not products_to_fix:
             print("✅ Keine Barcode-Nummern mit .0 gefunden - alles ist bereits korrekt!")
@@ -89,25 +94,30 @@ def main():
         
         # Updates durchführen
         print("\n🔄 Bereinige Barcode-Nummern...")
+        with profile_stage('http'):
+            # Nur Requests, Ausgabe danach, damit die Phase reine HTTP-Zeit misst
+            outcomes = []
+            for product in products_to_fix:
+                try:
+                    # Update einzelnes Produkt
+                    update_response = supabase.table('products').update({
+                        'barcode_number': product['new_barcode']
+                    }).eq('id', product['id']).execute()
+                    outcomes.append((product, bool(update_response.data), None))
+                except Exception as e:
+                    outcomes.append((product, False, e))
+        
         updated_count = 0
         error_count = 0
-        
-        for product in products_to_fix:
-            try:
-                # Update einzelnes Produkt
-                update_response = supabase.table('products').update({
-                    'barcode_number': product['new_barcode']
-                }).eq('id', product['id']).execute()
-                
-                if update_response.data:
-                    print(f"✅ {product['item_number']}: {product['old_barcode']} → {product['new_barcode']}")
-                    updated_count += 1
-                else:
-                    print(f"❌ Fehler bei {product['item_number']}")
-                    error_count += 1
-                    
-            except Exception as e:
-                print(f"❌ Fehler bei {product['item_number']}: {e}")
+        for product, success, error in outcomes:
+            if success:
+                print(f"✅ {product['item_number']}: {product['old_barcode']} → {product['new_barcode']}")
+                updated_count += 1
+            elif error is not None:
+                print(f"❌ Fehler bei {product['item_number']}: {error}")
+                error_count += 1
+            else:
+                print(f"❌ Fehler bei {product['item_number']}")
                 error_count += 1
         
         print(f"\n🎉 Bereinigung abgeschlossen!")
@@ -117,9 +127,10 @@ def main():
         
         # Verifikation
         print("\n🔍 Verifikation...")
-        verification_response = supabase.table('products').select('barcode_number').like('barcode_number', '%.0').execute()
-        
-        remaining_with_dot_zero = len(verification_response.data) if verification_response.data else 0
+        with profile_stage('verify'):
+            verification_response = supabase.table('products').select('barcode_number').like('barcode_number', '%.0').execute()
+            
+            remaining_with_dot_zero = len(verification_response.data) if verification_response.data else 0
         
         if remaining_with_dot_zero == 0:
             print("✅ Alle Barcode-Nummern sind jetzt korrekt!")
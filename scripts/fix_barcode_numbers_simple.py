@@ -7,6 +7,7 @@ Entfernt .0 am Ende von Barcode-Nummern (z.B. 4255805303931.0 -> 4255805303931)
 import os
 from supabase import create_client, Client
 from dotenv import load_dotenv
+from profiling import profile_requested, enable_profiling, profile_stage
 import sys
 
 # Lade .env Datei
@@ -21,6 +22,8 @@ if not SUPABASE_URL or not SUPABASE_KEY:
     sys.exit(1)
 
 def main():
+    if profile_requested():
+        enable_profiling('fix_barcode_numbers_simple')
     try:
         print("🚀 Starte Barcode-Bereinigung...")
         
@@ -30,7 +33,8 @@ def main():
         
         # Alle Produkte laden
         print("📖 Lade alle Produkte...")
-        response = supabase.table('products').select('id, item_number_vysn, barcode_number').execute()
+        with profile_stage('fetch'):
+            response = supabase.table('products').select('id, item_number_vysn, barcode_number').execute()
         
         if not response.data:
             print("❌ Keine Produkte gefunden")
@@ -40,17 +44,18 @@ def main():
         print(f"✅ {len(products)} Produkte gefunden")
         
         # Finde Produkte mit .0 am Ende der Barcode-Nummer
-        products_to_fix = []
-        for product in products:
-            barcode = product.get('barcode_number')
-            if barcode and str(barcode).endswith('.0'):
-                new_barcode = str(barcode)[:-2]  # Entferne .0
-                products_to_fix.append({
-                    'id': product['id'],
-                    'item_number': product.get('item_number_vysn', 'N/A'),
-                    'old_barcode': barcode,
-                    'new_barcode': new_barcode
-                })
+        with profile_stage('match'):
+            products_to_fix = []
+            for product in products:
+                barcode = product.get('barcode_number')
+                if barcode and str(barcode).endswith('.0'):
+                    new_barcode = str(barcode)[:-2]  # Entferne .0
+                    products_to_fix.append({
+                        'id': product['id'],
+                        'item_number': product.get('item_number_vysn', 'N/A'),
+                        'old_barcode': barcode,
+                        'new_barcode': new_barcode
+                    })
         
         if not products_to_fix:
             print("✅ Keine Barcode-Nummern mit .0 gefunden - alles ist bereits korrekt!")
@@ -73,25 +78,30 @@ def main():
         
         # Updates durchführen
         print("\n🔄 Bereinige Barcode-Nummern...")
+        with profile_stage('http'):
+            # Nur Requests, Ausgabe danach, damit die Phase reine HTTP-Zeit misst
+            outcomes = []
+            for product in products_to_fix:
+                try:
+                    # Update einzelnes Produkt
+                    update_response = supabase.table('products').update({
+                        'barcode_number': product['new_barcode']
+                    }).eq('id', product['id']).execute()
+                    outcomes.append((product, bool(update_response.data), None))
+                except Exception as e:
+                    outcomes.append((product, False, e))
+        
         updated_count = 0
         error_count = 0
-        
-        for product in products_to_fix:
-            try:
-                # Update einzelnes Produkt
-                update_response = supabase.table('products').update({
-                    'barcode_number': product['new_barcode']
-                }).eq('id', product['id']).execute()
-                
-                if update_response.data:
-                    print(f"✅ {product['item_number']}: {product['old_barcode']} → {product['new_barcode']}")
-                    updated_count += 1
-                else:
-                    print(f"❌ Fehler bei {product['item_number']}")
-                    error_count += 1
-                    
-            except Exception as e:
-                print(f"❌ Fehler bei {product['item_number']}: {e}")
+        for product, success, error in outcomes:
+            if success:
+                print(f"✅ {product['item_number']}: {product['old_barcode']} → {product['new_barcode']}")
+                updated_count += 1
+            elif error is not None:
+                print(f"❌ Fehler bei {product['item_number']}: {error}")
+                error_count += 1
+            else:
+                print(f"❌ Fehler bei {product['item_number']}")
                 error_count += 1
         
         print(f"\n🎉 Bereinigung abgeschlossen!")
@@ -2,15 +2,28 @@
 """
 Script zur Migration der Excel-Daten in die Supabase-Datenbank
 Liest die Data_English_17.07.2025_s.xlsx und importiert alle Produkte in die products-Tabelle
+Bricht der Import ab, setzt ein erneuter Aufruf anhand von .import_journal.json bei der
+letzten erfolgreichen Charge fort (Upsert über item_number_vysn, --fresh für Neuimport)
+
+Voraussetzung: database/supabase_schema_products_real.sql und die Migration
+database/add_derived_spec_columns.sql müssen ausgeführt sein, sonst lehnt Supabase jede Charge ab
 """
 
 import pandas as pd
 import os
+import argparse
 from supabase import create_client, Client
 from datetime import datetime
 import numpy as np
 import sys
 from dotenv import load_dotenv
+from derived_specs import derive_spec_columns, DERIVED_COLUMNS
+from search_index import write_search_index, DEFAULT_INDEX_PATH
+from import_journal import (
+    DEFAULT_JOURNAL_PATH, workbook_fingerprint, new_journal, load_journal, save_journal,
+    can_resume, mark_committed, is_committed, committed_count
+)
+from profiling import enable_profiling, profile_stage
 
 # Lade .env Datei
 load_dotenv()
@@ -27,6 +40,9 @@ if not SUPABASE_URL or not SUPABASE_KEY:
     print("   oder: export SUPABASE_ANON_KEY='your-anon-key'")
     sys.exit(1)
 
+EXCEL_FILE = 'Data_English_17.07.2025_s.xlsx'
+BATCH_SIZE = 50
+
 def clean_value(value):
     """Bereinigt Werte für die Datenbank"""
     if pd.isna(value) or value == '' or value == 'nan':
@@ -192,11 +208,58 @@ def map_excel_to_db_columns(df):
                 else:
                     product[db_col] = clean_value(value)
         
+        # Abgeleitete Spalten (CCT-Liste, Winkelbereich, Hüllmaße, lm/W) einmalig berechnen
+        product.update(derive_spec_columns(product))
+        
         products.append(product)
     
     return products
 
+def check_derived_columns(supabase):
+    """Bricht ab, wenn die Migration add_derived_spec_columns.sql noch fehlt"""
+    try:
+        supabase.table('products').select(','.join(DERIVED_COLUMNS)).limit(1).execute()
+    except Exception as e:
+        print("❌ Fehler: Die abgeleiteten Spalten fehlen in der products-Tabelle")
+        print("   Führe zuerst die Migration aus: database/add_derived_spec_columns.sql")
+        print(f"   Details: {e}")
+        sys.exit(1)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Excel-Import nach Supabase (unterbrechbar, mit Journal)")
+    parser.add_argument('--excel', default=EXCEL_FILE, help="Pfad zur Excel-Datei")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help="Produkte pro Charge")
+    parser.add_argument('--journal', default=DEFAULT_JOURNAL_PATH, help="Pfad zum Import-Journal")
+    parser.add_argument('--fresh', action='store_true',
+                        help="Journal ignorieren, alte Daten löschen und komplett neu importieren")
+    parser.add_argument('--profile', action='store_true',
+                        help="Phasen profilieren (cProfile, Stack-Samples, tracemalloc) nach profiles/")
+    return parser.parse_args()
+
+def upload_batch(supabase, batch, offset):
+    """Lädt eine Charge per Upsert hoch; gibt True zurück wenn alle Produkte gespeichert wurden"""
+    try:
+        supabase.table('products').upsert(batch, on_conflict='item_number_vysn').execute()
+        return True
+    except Exception as e:
+        print(f"❌ Fehler bei Charge ab Produkt {offset + 1}: {e}")
+    
+    # Einzeln versuchen bei Fehlern
+    all_ok = True
+    for j, product in enumerate(batch):
+        try:
+            supabase.table('products').upsert(product, on_conflict='item_number_vysn').execute()
+            print(f"  ✅ Produkt {offset+j+1} einzeln hochgeladen")
+        except Exception as e2:
+            all_ok = False
+            print(f"  ❌ Fehler bei Produkt {offset+j+1}: {e2}")
+            print(f"     Item: {product.get('item_number_vysn', 'N/A')}")
+    return all_ok
+
 def main():
+    args = parse_args()
+    if args.profile:
+        enable_profiling('import_excel_to_supabase')
     try:
         print("🚀 Starte Excel-Import nach Supabase...")
         
@@ -204,68 +267,109 @@ def main():
         supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
         print("✅ Supabase-Verbindung hergestellt")
         
+        # Schema prüfen, bevor gelöscht oder hochgeladen wird
+        check_derived_columns(supabase)
+        
         # Excel-Datei lesen
         print("📖 Lese Excel-Datei...")
-        df = pd.read_excel('Data_English_17.07.2025_s.xlsx')
+        with profile_stage('read_excel'):
+            fingerprint = workbook_fingerprint(args.excel)
+            df = pd.read_excel(args.excel)
         print(f"✅ {len(df)} Zeilen aus Excel-Datei gelesen")
         
         # Daten transformieren
         print("🔄 Transformiere Daten...")
-        products = map_excel_to_db_columns(df)
+        with profile_stage('transform'):
+            products = map_excel_to_db_columns(df)
         print(f"✅ {len(products)} Produkte vorbereitet")
         
-        # Alte Daten löschen (optional)
-        print("🗑️ Lösche alte Produktdaten...")
-        try:
-            result = supabase.table('products').delete().neq('id', 0).execute()
-            print("✅ Alte Daten gelöscht")
-        except Exception as e:
-            print(f"⚠️ Warnung beim Löschen alter Daten: {e}")
+        # Journal prüfen: gleiche Arbeitsmappe und unvollständiger Lauf -> fortsetzen
+        journal = None if args.fresh else load_journal(args.journal)
+        if journal and journal.get('fingerprint') == fingerprint and journal.get('completed_at'):
+            print(f"✅ {args.excel} wurde bereits vollständig importiert ({journal['completed_at']})")
+            print("   Für einen kompletten Neuimport: --fresh")
+            return
+        
+        if can_resume(journal, fingerprint, len(products)):
+            print(f"⏩ Setze abgebrochenen Import fort: {committed_count(journal)}/{len(products)} Produkte bereits hochgeladen")
+        else:
+            journal = new_journal(args.excel, fingerprint, len(products))
+            save_journal(journal, args.journal)
+        
+        # Alte Daten nur zu Beginn eines neuen Laufs löschen, nie beim Fortsetzen
+        if not journal['cleared']:
+            with profile_stage('delete_old'):
+                print("🗑️ Lösche alte Produktdaten...")
+                try:
+                    result = supabase.table('products').delete().neq('id', 0).execute()
+                    print("✅ Alte Daten gelöscht")
+                except Exception as e:
+                    print(f"⚠️ Warnung beim Löschen alter Daten: {e}")
+            journal['cleared'] = True
+            save_journal(journal, args.journal)
         
         # Daten in Chargen hochladen (Supabase hat Limits)
-        batch_size = 50
+        batch_size = args.batch_size
         total_batches = len(products) // batch_size + (1 if len(products) % batch_size > 0 else 0)
         
         print(f"📤 Lade Daten in {total_batches} Chargen hoch...")
         
-        for i in range(0, len(products), batch_size):
-            batch = products[i:i + batch_size]
-            batch_num = (i // batch_size) + 1
-            
+        with profile_stage('upload'):
+            failed_batches = 0
+            for i in range(0, len(products), batch_size):
+                batch = products[i:i + batch_size]
+                batch_num = (i // batch_size) + 1
+                
+                if is_committed(journal, i, i + len(batch)):
+                    continue
+                
+                if upload_batch(supabase, batch, i):
+                    # Erst nach erfolgreichem Upload ins Journal schreiben
+                    mark_committed(journal, i, i + len(batch))
+                    save_journal(journal, args.journal)
+                    print(f"✅ Charge {batch_num}/{total_batches} erfolgreich hochgeladen ({len(batch)} Produkte)")
+                else:
+                    failed_batches += 1
+        
+        if failed_batches:
+            print(f"\n⚠️ {failed_batches} Chargen nicht vollständig hochgeladen.")
+            print("   Erneut ausführen, um nur die fehlenden Chargen zu wiederholen.")
+        else:
+            journal['completed_at'] = datetime.now().isoformat()
+            save_journal(journal, args.journal)
+        
+        # Suchindex für die Produktsuche aufbauen
+        print("🔎 Baue Suchindex...")
+        with profile_stage('search_index'):
             try:
-                result = supabase.table('products').insert(batch).execute()
-                print(f"✅ Charge {batch_num}/{total_batches} erfolgreich hochgeladen ({len(batch)} Produkte)")
+                index_size = write_search_index(products, DEFAULT_INDEX_PATH)
+                print(f"✅ Suchindex geschrieben: {DEFAULT_INDEX_PATH} ({index_size / 1024:.1f} KB)")
             except Exception as e:
-                print(f"❌ Fehler bei Charge {batch_num}: {e}")
-                # Einzeln versuchen bei Fehlern
-                for j, product in enumerate(batch):
-                    try:
-                        supabase.table('products').insert(product).execute()
-                        print(f"  ✅ Produkt {i+j+1} einzeln hochgeladen")
-                    except Exception as e2:
-                        print(f"  ❌ Fehler bei Produkt {i+j+1}: {e2}")
-                        print(f"     Item: {product.get('item_number_vysn', 'N/A')}")
+                print(f"⚠️ Warnung beim Schreiben des Suchindex: {e}")
         
         # Statistiken abrufen
         print("\n📊 Import-Statistiken:")
-        result = supabase.table('products').select('count', count='exact').execute()
-        total_count = result.count if result.count else 0
-        print(f"   Gesamtanzahl Produkte in DB: {total_count}")
+        with profile_stage('stats'):
+            result = supabase.table('products').select('count', count='exact').execute()
+            total_count = result.count if result.count else 0
+            print(f"   Gesamtanzahl Produkte in DB: {total_count}")
+        
+            # Kategorien-Statistiken
+            result = supabase.table('products').select('category_1').execute()
+            if result.data:
+                categories = set(p['category_1'] for p in result.data if p['category_1'])
+                print(f"   Anzahl Kategorien: {len(categories)}")
         
-        # Kategorien-Statistiken
-        result = supabase.table('products').select('category_1').execute()
-        if result.data:
-            categories = set(p['category_1'] for p in result.data if p['category_1'])
-            print(f"   Anzahl Kategorien: {len(categories)}")
+        if failed_batches:
+            return
         
         print("\n🎉 Import erfolgreich abgeschlossen!")
         print("\nNächste Schritte:")
-        print("1. Führe das SQL-Schema aus: supabase_schema_products_real.sql")
-        print("2. Starte das Backend: npm run dev")
-        print("3. Teste die API: curl http://localhost:3001/api/products/search?q=LED")
+        print("1. Starte das Backend: npm run dev")
+        print("2. Teste die API: curl http://localhost:3001/api/products/search?q=LED")
         
     except FileNotFoundError:
-        print("❌ Fehler: Data_English_17.07.2025_s.xlsx nicht gefunden")
+        print(f"❌ Fehler: {args.excel} nicht gefunden")
         print("Stelle sicher, dass die Excel-Datei im aktuellen Verzeichnis liegt.")
     except Exception as e:
         print(f"❌ Unerwarteter Fehler: {e}")
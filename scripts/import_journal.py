@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Journal für unterbrechbare Excel-Importe
+Speichert den Fingerabdruck der Arbeitsmappe und alle bereits hochgeladenen Produktbereiche,
+damit ein abgebrochener Import an der letzten erfolgreichen Charge weitermachen kann
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+
+DEFAULT_JOURNAL_PATH = '.import_journal.json'
+JOURNAL_VERSION = 1
+
+
+def workbook_fingerprint(path):
+    """SHA-256 über den Dateiinhalt der Arbeitsmappe"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def new_journal(workbook, fingerprint, total_products):
+    """Legt ein leeres Journal für einen neuen Importlauf an"""
+    return {
+        'version': JOURNAL_VERSION,
+        'workbook': os.path.basename(workbook),
+        'fingerprint': fingerprint,
+        'total_products': total_products,
+        'cleared': False,
+        'committed_ranges': [],
+        'started_at': datetime.now().isoformat(),
+        'updated_at': None,
+        'completed_at': None,
+    }
+
+
+def load_journal(path=DEFAULT_JOURNAL_PATH):
+    """Lädt das Journal oder None, wenn keines existiert oder es unlesbar ist"""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            journal = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Warnung: Import-Journal {path} unlesbar, starte neu: {e}")
+        return None
+    if journal.get('version') != JOURNAL_VERSION:
+        return None
+    return journal
+
+
+def save_journal(journal, path=DEFAULT_JOURNAL_PATH):
+    """Schreibt das Journal atomar, damit ein Abbruch nie eine halbe Datei hinterlässt"""
+    journal['updated_at'] = datetime.now().isoformat()
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(journal, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def can_resume(journal, fingerprint, total_products):
+    """Prüft ob das Journal zum aktuellen Workbook passt und noch offen ist"""
+    return (
+        journal is not None
+        and journal.get('fingerprint') == fingerprint
+        and journal.get('total_products') == total_products
+        and journal.get('completed_at') is None
+    )
+
+
+def mark_committed(journal, start, end):
+    """Trägt den Bereich [start, end) als hochgeladen ein und fasst angrenzende Bereiche zusammen"""
+    ranges = sorted(journal['committed_ranges'] + [[start, end]])
+    merged = []
+    for range_start, range_end in ranges:
+        if merged and range_start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], range_end)
+        else:
+            merged.append([range_start, range_end])
+    journal['committed_ranges'] = merged
+
+
+def is_committed(journal, start, end):
+    """True wenn [start, end) vollständig in einem hochgeladenen Bereich liegt"""
+    return any(range_start <= start and end <= range_end
+               for range_start, range_end in journal['committed_ranges'])
+
+
+def committed_count(journal):
+    """Anzahl der bereits hochgeladenen Produkte"""
+    return sum(range_end - range_start for range_start, range_end in journal['committed_ranges'])
+
+
+def discard_journal(path=DEFAULT_JOURNAL_PATH):
+    """Entfernt das Journal, z.B. nachdem die Tabelle manuell geleert wurde"""
+    if os.path.exists(path):
+        os.remove(path)
+        return True
+    return False
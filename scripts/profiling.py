@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Profiling für die Datenskripte (--profile)
+Misst jede benannte Phase mit einem Stack-Sampler, äußere Phasen zusätzlich mit cProfile und tracemalloc:
+    profiles/<skript>-<zeit>/<phase>.prof   cProfile-Statistik (pstats, snakeviz)
+    profiles/<skript>-<zeit>/stacks.collapsed  Stack-Samples im Folded-Format (flamegraph.pl, speedscope)
+    profiles/<skript>-<zeit>/summary.txt   Laufzeiten, teuerste Funktionen und größte Allokationen je Phase
+Ohne --profile ist profile_stage() ein wiederverwendeter nullcontext und kostet praktisch nichts.
+
+Verwendung im Skript:
+    if profile_requested():
+        enable_profiling('update_stock_from_excel')
+    with profile_stage('read_excel'):
+        df = pd.read_excel(...)
+"""
+
+import atexit
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+DEFAULT_PROFILE_DIR = 'profiles'
+SAMPLE_INTERVAL_SECONDS = 0.005
+TOP_FUNCTIONS = 15
+TOP_ALLOCATIONS = 10
+
+_NULL_STAGE = nullcontext()
+_profiler = None
+
+
+def profile_requested(argv=None):
+    """True wenn --profile auf der Kommandozeile steht (für Skripte ohne argparse)"""
+    return '--profile' in (sys.argv[1:] if argv is None else argv)
+
+
+def enable_profiling(script_name, output_dir=DEFAULT_PROFILE_DIR):
+    """Aktiviert das Profiling für den restlichen Lauf; Ergebnisse werden beim Beenden geschrieben"""
+    global _profiler
+    if _profiler is None:
+        _profiler = _Profiler(script_name, output_dir)
+        atexit.register(_profiler.finish)
+        print(f"🔬 Profiling aktiv, Ergebnisse in {_profiler.output_dir}")
+    return _profiler
+
+
+def profile_stage(name):
+    """Kontextmanager für eine benannte Phase; ohne aktives Profiling ein No-op"""
+    if _profiler is None:
+        return _NULL_STAGE
+    return _profiler.stage(name)
+
+
+def _frame_label(frame):
+    """Frame-Bezeichnung für das Folded-Format (ohne Semikolons)"""
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(';', ',')
+
+
+class _StageResult:
+    """Messergebnis einer Phase"""
+
+    def __init__(self, path, seconds, peak_bytes, top_allocations, stats_text):
+        self.path = path
+        self.seconds = seconds
+        self.peak_bytes = peak_bytes
+        self.top_allocations = top_allocations
+        self.stats_text = stats_text
+
+
+class _Profiler:
+    """Sammelt Messungen aller Phasen eines Skriptlaufs"""
+
+    def __init__(self, script_name, output_dir):
+        timestamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        self.output_dir = os.path.join(output_dir, f"{script_name}-{timestamp}")
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        self.stack = []
+        self.results = []
+        self.samples = defaultdict(Counter)
+        self.main_thread_id = threading.main_thread().ident
+        self.finished = False
+
+        tracemalloc.start()
+        self.stop_event = threading.Event()
+        self.sampler = threading.Thread(target=self._sample_loop, name='profiling-sampler', daemon=True)
+        self.sampler.start()
+
+    def _sample_loop(self):
+        """Nimmt periodisch den Stack des Hauptthreads auf und ordnet ihn der aktiven Phase zu"""
+        own_file = os.path.abspath(__file__)
+        while not self.stop_event.wait(SAMPLE_INTERVAL_SECONDS):
+            stack = list(self.stack)
+            if not stack:
+                continue
+            frame = sys._current_frames().get(self.main_thread_id)
+            frames = []
+            while frame is not None:
+                if os.path.abspath(frame.f_code.co_filename) != own_file:
+                    frames.append(_frame_label(frame))
+                frame = frame.f_back
+            folded = ';'.join(['stage:' + name for name in stack] + frames[::-1])
+            self.samples['/'.join(stack)][folded] += 1
+
+    @contextmanager
+    def stage(self, name):
+        self.stack.append(name)
+        path = '/'.join(self.stack)
+        # cProfile lässt sich nicht verschachteln; Snapshots nur außen, damit sie keine Phase verfälschen
+        outermost = len(self.stack) == 1
+        profile = cProfile.Profile() if outermost else None
+        if outermost:
+            before = tracemalloc.take_snapshot()
+            tracemalloc.reset_peak()
+            profile.enable()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            if not outermost:
+                self.stack.pop()
+                self.results.append(_StageResult(path, seconds, None, [], None))
+            else:
+                profile.disable()
+                peak_bytes = tracemalloc.get_traced_memory()[1]
+                # Erst poppen, damit der Sampler Snapshot und Auswertung keiner Phase zuordnet
+                self.stack.pop()
+                after = tracemalloc.take_snapshot()
+                self.results.append(self._evaluate(path, seconds, peak_bytes, before, after, profile))
+
+    def _evaluate(self, path, seconds, peak_bytes, before, after, profile):
+        """Allokationsvergleich und cProfile-Auswertung einer äußeren Phase"""
+        filters = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+        top_allocations = after.filter_traces(filters).compare_to(before.filter_traces(filters), 'lineno')
+        profile.dump_stats(os.path.join(self.output_dir, f"{path}.prof"))
+        buffer = io.StringIO()
+        pstats.Stats(profile, stream=buffer).sort_stats('cumulative').print_stats(TOP_FUNCTIONS)
+        return _StageResult(path, seconds, peak_bytes, top_allocations[:TOP_ALLOCATIONS], buffer.getvalue())
+
+    def finish(self):
+        """Stoppt Sampler und tracemalloc und schreibt Folded-Stacks und Zusammenfassung"""
+        if self.finished:
+            return
+        self.finished = True
+        self.stop_event.set()
+        self.sampler.join()
+        tracemalloc.stop()
+
+        with open(os.path.join(self.output_dir, 'stacks.collapsed'), 'w', encoding='utf-8') as f:
+            for stage_samples in self.samples.values():
+                for folded, count in stage_samples.items():
+                    f.write(f"{folded} {count}\n")
+
+        lines = []
+        print("\n🔬 Profiling-Zusammenfassung:")
+        for result in self.results:
+            sample_count = sum(self.samples[result.path].values())
+            headline = f"{result.path}: {result.seconds:.3f} s, {sample_count} Samples"
+            if result.peak_bytes is not None:
+                headline += f", Peak {result.peak_bytes / 1024 / 1024:.1f} MB"
+            print(f"   {headline}")
+            lines.append('=' * 80)
+            lines.append(headline)
+            if result.top_allocations:
+                lines.append('-' * 80)
+                lines.append(f"Top {TOP_ALLOCATIONS} Allokationen (Zuwachs während der Phase):")
+                for stat in result.top_allocations:
+                    lines.append(f"  {stat}")
+            if result.stats_text:
+                lines.append('')
+                lines.append(result.stats_text.strip())
+            lines.append('')
+
+        with open(os.path.join(self.output_dir, 'summary.txt'), 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines))
+        print(f"   Details: {os.path.join(self.output_dir, 'summary.txt')}")
+        print(f"   Flamegraph: flamegraph.pl {os.path.join(self.output_dir, 'stacks.collapsed')} > flame.svg")
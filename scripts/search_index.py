@@ -0,0 +1,579 @@
+#!/usr/bin/env python3
+"""
+Vorberechneter Suchindex für die Produktsuche
+Baut beim Import einen invertierten Index und einen Trigramm-Index über Namen, Artikelnummern,
+Beschreibungen und Kategorien und schreibt ihn als kompakte, per mmap lesbare Datei.
+
+Verwendung:
+    python3 search_index.py build [--output products_search.idx] [--source products.parquet]
+    python3 search_index.py query "warmweiß downlight" [--index products_search.idx]
+    python3 search_index.py bench [--index products_search.idx] [--queries 2000]
+"""
+
+import argparse
+import bisect
+import heapq
+import mmap
+import os
+import random
+import re
+import struct
+import sys
+import time
+import unicodedata
+from array import array
+from collections import Counter, defaultdict
+
+DEFAULT_INDEX_PATH = 'products_search.idx'
+
+INDEX_MAGIC = b'VYSNIDX1'
+INDEX_VERSION = 1
+# Magic, Version und sieben Zähler (siehe write_search_index)
+HEADER_FORMAT = '<8s8I'
+
+# Gewichtung der Felder, pro Term und Produkt zählt das stärkste Feld
+FIELD_WEIGHTS = {
+    'item_number_vysn': 8,
+    'vysn_name': 5,
+    'category_1': 3,
+    'category_2': 3,
+    'group_name': 3,
+    'short_description': 2,
+    'long_description': 1,
+}
+
+# Deutsche Umlaute und ß vor dem Entfernen von Akzenten falten
+UMLAUT_MAP = str.maketrans({'ä': 'ae', 'ö': 'oe', 'ü': 'ue', 'ß': 'ss'})
+
+# Mehrwortbegriffe, die vor der Tokenisierung zusammengezogen werden
+PHRASE_PATTERNS = [
+    (re.compile(r'\b(warm|neutral|kalt)[\s-]+weiss\b'), r'\1weiss'),
+    (re.compile(r'\b(warm|neutral|cool|cold)[\s-]+white\b'), r'\1white'),
+    (re.compile(r'\bdim[\s-]*(?:to|2)[\s-]*warm\b|\bd2w\b'), 'dimtowarm'),
+    (re.compile(r'\b(\d{4})\s*(?:k|kelvin)\b'), r'\1'),
+]
+
+# Synonyme wie CCT_TERMS in backend/src/utils/cctUtils.ts
+SYNONYMS = {
+    'warmweiss': ['2700'],
+    'warmwhite': ['2700'],
+    'neutralweiss': ['3000'],
+    'neutralwhite': ['3000'],
+    'kaltweiss': ['4000'],
+    'coolwhite': ['4000'],
+    'coldwhite': ['4000'],
+}
+
+_TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+# Gewichtsfaktoren je Trefferart
+EXACT_FACTOR = 1.0
+PREFIX_FACTOR = 0.8
+MAX_PREFIX_EXPANSIONS = 50
+MAX_FUZZY_CANDIDATES = 50
+# Ab dieser Trefferzahl wird ein Suchbegriff nur noch gegen die bisherigen Kandidaten bewertet
+MAX_CANDIDATES = 1000
+
+
+def normalize_text(text):
+    """Kleinschreibung, Umlaut/ß-Faltung, Akzente entfernen, Mehrwortbegriffe zusammenziehen"""
+    if text is None:
+        return ''
+    text = str(text).lower().translate(UMLAUT_MAP)
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    for pattern, replacement in PHRASE_PATTERNS:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def tokenize(text):
+    """Zerlegt Text in normalisierte Tokens inklusive Synonymen"""
+    tokens = []
+    for token in _TOKEN_PATTERN.findall(normalize_text(text)):
+        tokens.append(token)
+        tokens.extend(SYNONYMS.get(token, []))
+    return tokens
+
+
+def _trigrams(term):
+    """Trigramme eines Terms mit Randmarkierung, als 24-Bit Zahlen kodiert"""
+    padded = b'$' + term + b'$'
+    return {(padded[i] << 16) | (padded[i + 1] << 8) | padded[i + 2] for i in range(len(padded) - 2)}
+
+
+def _document_terms(product):
+    """Sammelt alle Terms eines Produkts mit dem jeweils höchsten Feldgewicht"""
+    terms = {}
+    for field, weight in FIELD_WEIGHTS.items():
+        value = product.get(field)
+        if value is None:
+            continue
+        for token in tokenize(value):
+            if terms.get(token, 0) < weight:
+                terms[token] = weight
+
+    # Vollständige Artikelnummer zusätzlich als ein Term (V115201B2 statt v115201 + b2)
+    item_number = ''.join(_TOKEN_PATTERN.findall(normalize_text(product.get('item_number_vysn'))))
+    if item_number:
+        terms[item_number] = FIELD_WEIGHTS['item_number_vysn']
+
+    # Abgeleitete CCT-Werte (siehe derived_specs.py), damit "warmweiß" auch CCT-Switch Produkte findet
+    for cct in product.get('cct_values') or []:
+        terms.setdefault(str(cct), 1)
+    return terms
+
+
+def _pad4(buffer):
+    """Füllt auf 4-Byte-Grenze auf, damit uint32-Abschnitte direkt gecastet werden können"""
+    buffer.extend(b'\0' * (-len(buffer) % 4))
+
+
+def _blob_with_offsets(strings):
+    """Baut (Offsets, Blob) für eine Liste von Byte-Strings"""
+    offsets = array('I', [0])
+    blob = bytearray()
+    for value in strings:
+        blob.extend(value)
+        offsets.append(len(blob))
+    return offsets, blob
+
+
+def build_search_index(products):
+    """Baut den Suchindex für eine Produktliste und gibt die Datei als bytes zurück"""
+    documents = []
+    postings = defaultdict(list)
+
+    for product in products:
+        doc_id = len(documents)
+        label = '{}\t{}'.format(product.get('item_number_vysn') or '', product.get('vysn_name') or '')
+        documents.append(label.encode('utf-8'))
+        for term, weight in _document_terms(product).items():
+            postings[term.encode('ascii')].append((doc_id, weight))
+
+    terms = sorted(postings)
+    doc_offsets, doc_blob = _blob_with_offsets(documents)
+    term_offsets, term_blob = _blob_with_offsets(terms)
+
+    posting_offsets = array('I', [0])
+    posting_docs = array('I')
+    posting_weights = bytearray()
+    trigram_terms = defaultdict(list)
+    for term_id, term in enumerate(terms):
+        for doc_id, weight in postings[term]:
+            posting_docs.append(doc_id)
+            posting_weights.append(weight)
+        posting_offsets.append(len(posting_docs))
+        for trigram in _trigrams(term):
+            trigram_terms[trigram].append(term_id)
+
+    trigram_keys = array('I', sorted(trigram_terms))
+    trigram_offsets = array('I', [0])
+    trigram_postings = array('I')
+    for trigram in trigram_keys:
+        trigram_postings.extend(trigram_terms[trigram])
+        trigram_offsets.append(len(trigram_postings))
+
+    sections = [
+        doc_offsets, doc_blob,
+        term_offsets, term_blob,
+        posting_offsets, posting_docs, posting_weights,
+        trigram_keys, trigram_offsets, trigram_postings,
+    ]
+    if sys.byteorder != 'little':
+        for section in sections:
+            if isinstance(section, array):
+                section.byteswap()
+
+    output = bytearray(struct.pack(
+        HEADER_FORMAT, INDEX_MAGIC, INDEX_VERSION,
+        len(documents), len(doc_blob), len(terms), len(term_blob),
+        len(posting_docs), len(trigram_keys), len(trigram_postings),
+    ))
+    for section in sections:
+        output.extend(section.tobytes() if isinstance(section, array) else section)
+        _pad4(output)
+    return bytes(output)
+
+
+def write_search_index(products, path=DEFAULT_INDEX_PATH):
+    """Schreibt den Suchindex atomar nach path und gibt die Dateigröße zurück"""
+    data = build_search_index(products)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return len(data)
+
+
+def _damerau_levenshtein(a, b, max_distance):
+    """Editierdistanz mit Vertauschungen, bricht ab sobald max_distance überschritten ist"""
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous_previous is not None and i > 1 and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous_previous, previous = previous, current
+    return previous[-1]
+
+
+def _max_edits(term):
+    """Erlaubte Tippfehler abhängig von der Termlänge"""
+    if len(term) < 4:
+        return 0
+    if len(term) < 8:
+        return 1
+    return 2
+
+
+class _BlobSequence:
+    """Sequenz-Sicht auf (Offsets, Blob), damit bisect direkt auf der mmap arbeiten kann"""
+
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        return bytes(self.blob[self.offsets[index]:self.offsets[index + 1]])
+
+
+class SearchIndex:
+    """Lesezugriff auf eine per write_search_index erzeugte Indexdatei über mmap"""
+
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        self._file = open(path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+
+        header_size = struct.calcsize(HEADER_FORMAT)
+        (magic, version, n_docs, doc_blob_len, n_terms, term_blob_len,
+         n_postings, n_trigrams, n_trigram_postings) = struct.unpack_from(HEADER_FORMAT, self._mmap)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            self.close()
+            raise ValueError(f"Keine gültige Suchindex-Datei (Version {INDEX_VERSION}): {path}")
+        if sys.byteorder != 'little':
+            self.close()
+            raise ValueError("Suchindex kann nur auf Little-Endian Systemen gelesen werden")
+
+        self._position = header_size
+        doc_offsets = self._take_uint32(n_docs + 1)
+        doc_blob = self._take_bytes(doc_blob_len)
+        term_offsets = self._take_uint32(n_terms + 1)
+        term_blob = self._take_bytes(term_blob_len)
+        self._posting_offsets = self._take_uint32(n_terms + 1)
+        self._posting_docs = self._take_uint32(n_postings)
+        self._posting_weights = self._take_bytes(n_postings)
+        self._trigram_keys = self._take_uint32(n_trigrams)
+        self._trigram_offsets = self._take_uint32(n_trigrams + 1)
+        self._trigram_postings = self._take_uint32(n_trigram_postings)
+
+        self._documents = _BlobSequence(doc_offsets, doc_blob)
+        self._terms = _BlobSequence(term_offsets, term_blob)
+        self.document_count = n_docs
+        self.term_count = n_terms
+
+    def _take_bytes(self, length):
+        """Liest einen Byte-Abschnitt und springt zur nächsten 4-Byte-Grenze"""
+        section = self._view[self._position:self._position + length]
+        self._position += length + (-length % 4)
+        return section
+
+    def _take_uint32(self, count):
+        """Liest einen uint32-Abschnitt ohne Kopie"""
+        return self._take_bytes(count * 4).cast('I')
+
+    def close(self):
+        """Gibt mmap und Datei frei"""
+        for attribute in ['_documents', '_terms', '_posting_offsets', '_posting_docs',
+                          '_posting_weights', '_trigram_keys', '_trigram_offsets', '_trigram_postings']:
+            if hasattr(self, attribute):
+                delattr(self, attribute)
+        if hasattr(self, '_view'):
+            self._view.release()
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _posting_range(self, term_id):
+        """Start und Ende der Postings eines Terms (nach doc_id sortiert)"""
+        return self._posting_offsets[term_id], self._posting_offsets[term_id + 1]
+
+    def _document_frequency(self, matches):
+        """Obergrenze der Trefferzahl eines Suchbegriffs, ohne die Postings zu lesen"""
+        return sum(self._posting_offsets[term_id + 1] - self._posting_offsets[term_id] for term_id in matches)
+
+    def _postings(self, term_id, candidates=None, candidate_set=None):
+        """
+        Liefert (doc_id, Gewicht) Paare eines Terms, optional nur für die sortierten candidates
+        Lange Posting-Listen werden dann per bisect durchsucht statt vollständig durchlaufen
+        """
+        start, end = self._posting_range(term_id)
+        docs = self._posting_docs[start:end]
+        weights = self._posting_weights[start:end]
+        if candidates is None:
+            return zip(docs, weights)
+        if len(docs) <= len(candidates):
+            return ((doc_id, weight) for doc_id, weight in zip(docs, weights) if doc_id in candidate_set)
+        return self._candidate_postings(docs, weights, candidates)
+
+    @staticmethod
+    def _candidate_postings(docs, weights, candidates):
+        """Sucht die sortierten candidates in einer sortierten Posting-Liste"""
+        position = 0
+        for doc_id in candidates:
+            position = bisect.bisect_left(docs, doc_id, position)
+            if position == len(docs):
+                return
+            if docs[position] == doc_id:
+                yield doc_id, weights[position]
+
+    def _top_candidates(self, matches, limit):
+        """Sortierte doc_ids der stärksten Treffer (Gewicht × Faktor) eines häufigen Suchbegriffs"""
+        term_weights = {}
+        groups = []
+        for term_id, factor in matches.items():
+            start, end = self._posting_range(term_id)
+            term_weights[term_id] = bytes(self._posting_weights[start:end])
+            groups.extend((weight * factor, term_id, weight) for weight in set(term_weights[term_id]))
+        groups.sort(reverse=True)
+
+        selected = set()
+        for _, term_id, weight in groups:
+            start = self._posting_offsets[term_id]
+            weights = term_weights[term_id]
+            needle = bytes([weight])
+            position = weights.find(needle)
+            while position != -1 and len(selected) < limit:
+                selected.add(self._posting_docs[start + position])
+                position = weights.find(needle, position + 1)
+            if len(selected) >= limit:
+                break
+        return sorted(selected)
+
+    def _lookup(self, token):
+        """Exakte Suche, bei Bedarf Präfix- und Tippfehler-Suche; liefert {term_id: Faktor}"""
+        term = token.encode('ascii')
+        index = bisect.bisect_left(self._terms, term)
+        matches = {}
+        if index < len(self._terms) and self._terms[index] == term:
+            matches[index] = EXACT_FACTOR
+            index += 1
+
+        # Präfix (z.B. unvollständige Artikelnummern)
+        if len(term) >= 3:
+            while index < len(self._terms) and len(matches) < MAX_PREFIX_EXPANSIONS:
+                candidate = self._terms[index]
+                if not candidate.startswith(term):
+                    break
+                matches.setdefault(index, PREFIX_FACTOR)
+                index += 1
+
+        if matches:
+            return matches
+        return self._fuzzy_lookup(term)
+
+    def _fuzzy_lookup(self, term):
+        """Tippfehlertolerante Suche über gemeinsame Trigramme und Editierdistanz"""
+        max_edits = _max_edits(term)
+        if max_edits == 0:
+            return {}
+
+        candidate_counts = Counter()
+        for trigram in _trigrams(term):
+            position = bisect.bisect_left(self._trigram_keys, trigram)
+            if position < len(self._trigram_keys) and self._trigram_keys[position] == trigram:
+                start = self._trigram_offsets[position]
+                end = self._trigram_offsets[position + 1]
+                candidate_counts.update(self._trigram_postings[start:end])
+
+        matches = {}
+        for term_id, _ in candidate_counts.most_common(MAX_FUZZY_CANDIDATES):
+            candidate = self._terms[term_id]
+            distance = _damerau_levenshtein(term, candidate, max_edits)
+            if distance <= max_edits:
+                matches[term_id] = 1.0 - distance / (len(term) + 1)
+        return matches
+
+    def search(self, query, limit=20):
+        """
+        Sucht Produkte zu einer Freitext-Anfrage
+        Sortiert nach Anzahl getroffener Suchbegriffe, dann nach Score.
+        Suchbegriffe werden vom seltensten an ausgewertet; sobald einer mehr als MAX_CANDIDATES Treffer
+        hat, werden nur noch die bisherigen Kandidaten bewertet (oder seine stärksten Treffer, falls
+        noch keine Kandidaten existieren). So bleibt die Latenz auch bei Allerweltsbegriffen begrenzt.
+        """
+        lookups = [self._lookup(token) for token in dict.fromkeys(tokenize(query))]
+        lookups = sorted((matches for matches in lookups if matches), key=self._document_frequency)
+
+        scores = defaultdict(float)
+        matched_tokens = defaultdict(int)
+        candidates = candidate_set = None
+
+        for matches in lookups:
+            if candidates is None and self._document_frequency(matches) > MAX_CANDIDATES:
+                candidates = sorted(scores) if scores else self._top_candidates(matches, MAX_CANDIDATES)
+                candidate_set = set(candidates)
+
+            token_scores = {}
+            for term_id, factor in matches.items():
+                for doc_id, weight in self._postings(term_id, candidates, candidate_set):
+                    score = weight * factor
+                    if score > token_scores.get(doc_id, 0):
+                        token_scores[doc_id] = score
+            for doc_id, score in token_scores.items():
+                scores[doc_id] += score
+                matched_tokens[doc_id] += 1
+
+        ranked = heapq.nlargest(limit, scores, key=lambda doc_id: (matched_tokens[doc_id], scores[doc_id]))
+        results = []
+        for doc_id in ranked:
+            item_number, _, name = self._documents[doc_id].decode('utf-8').partition('\t')
+            results.append({
+                'item_number_vysn': item_number,
+                'vysn_name': name,
+                'score': round(scores[doc_id], 3),
+            })
+        return results
+
+    def document_labels(self):
+        """Alle (Artikelnummer, Name) Paare in Indexreihenfolge"""
+        for doc_id in range(self.document_count):
+            item_number, _, name = self._documents[doc_id].decode('utf-8').partition('\t')
+            yield item_number, name
+
+
+def _introduce_typo(word, rng):
+    """Erzeugt einen Tippfehler (Auslassung, Vertauschung oder Ersetzung)"""
+    if len(word) < 4:
+        return word
+    position = rng.randrange(1, len(word) - 1)
+    kind = rng.choice(['delete', 'swap', 'replace'])
+    if kind == 'delete':
+        return word[:position] + word[position + 1:]
+    if kind == 'swap':
+        return word[:position] + word[position + 1] + word[position] + word[position + 2:]
+    return word[:position] + rng.choice('abcdefghijklmnopqrstuvwxyz') + word[position + 1:]
+
+
+def _percentile(sorted_values, percentile):
+    """Perzentil einer sortierten Liste (nächster Rang)"""
+    rank = max(0, min(len(sorted_values) - 1, int(round(percentile / 100 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+def run_benchmark(index, query_count=2000, seed=42):
+    """Misst p50/p99 Latenzen für tippfehlerbehaftete Anfragen aus dem eigenen Katalog"""
+    rng = random.Random(seed)
+    labels = [name for _, name in index.document_labels() if name]
+    if not labels:
+        raise ValueError("Suchindex enthält keine Produktnamen")
+
+    queries = []
+    for _ in range(query_count):
+        words = [w for w in re.findall(r'\w+', rng.choice(labels)) if len(w) >= 4] or ['downlight']
+        picked = rng.sample(words, min(len(words), 2))
+        queries.append(' '.join(_introduce_typo(w, rng) for w in picked))
+
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+
+    return {
+        'queries': len(queries),
+        'p50_ms': _percentile(latencies, 50),
+        'p99_ms': _percentile(latencies, 99),
+        'max_ms': latencies[-1],
+    }
+
+
+def _fetch_products_from_supabase():
+    """Lädt alle Produkte seitenweise aus Supabase (für den Neuaufbau ohne Import)"""
+    from dotenv import load_dotenv
+    from supabase import create_client
+
+    load_dotenv()
+    supabase_url = os.getenv('SUPABASE_URL')
+    supabase_key = os.getenv('SUPABASE_ANON_KEY') or os.getenv('SUPABASE_KEY')
+    if not supabase_url or not supabase_key:
+        print("❌ Fehler: SUPABASE_URL und SUPABASE_KEY müssen als Umgebungsvariablen gesetzt sein")
+        sys.exit(1)
+
+    supabase = create_client(supabase_url, supabase_key)
+    columns = ', '.join(list(FIELD_WEIGHTS) + ['cct_values'])
+    products = []
+    page_size = 1000
+    while True:
+        result = supabase.table('products').select(columns).order('id') \
+            .range(len(products), len(products) + page_size - 1).execute()
+        products.extend(result.data or [])
+        if not result.data or len(result.data) < page_size:
+            return products
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Produktsuchindex bauen, abfragen und messen")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help="Index aus der products-Tabelle neu bauen")
+    build_parser.add_argument('--output', default=DEFAULT_INDEX_PATH)
+    build_parser.add_argument('--source', help="Lokaler Export (export_products.py) statt Supabase")
+
+    query_parser = subparsers.add_parser('query', help="Suchanfrage gegen den Index ausführen")
+    query_parser.add_argument('text')
+    query_parser.add_argument('--index', default=DEFAULT_INDEX_PATH)
+    query_parser.add_argument('--limit', type=int, default=10)
+
+    bench_parser = subparsers.add_parser('bench', help="p50/p99 Latenz für Anfragen mit Tippfehlern")
+    bench_parser.add_argument('--index', default=DEFAULT_INDEX_PATH)
+    bench_parser.add_argument('--queries', type=int, default=2000)
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        if args.source:
+            from export_products import read_export
+
+            print(f"📖 Lade Produkte aus {args.source}...")
+            products = read_export(args.source)
+        else:
+            print("📖 Lade Produkte aus Supabase...")
+            products = _fetch_products_from_supabase()
+        size = write_search_index(products, args.output)
+        print(f"✅ Suchindex für {len(products)} Produkte geschrieben: {args.output} ({size / 1024:.1f} KB)")
+        return
+
+    with SearchIndex(args.index) as index:
+        if args.command == 'query':
+            for result in index.search(args.text, limit=args.limit):
+                print(f"  {result['score']:6.2f}  {result['item_number_vysn']:<16} {result['vysn_name']}")
+        else:
+            print(f"⏱️ Benchmark über {index.document_count} Produkte / {index.term_count} Terms...")
+            stats = run_benchmark(index, args.queries)
+            print(f"   Anfragen: {stats['queries']}")
+            print(f"   p50: {stats['p50_ms']:.3f} ms")
+            print(f"   p99: {stats['p99_ms']:.3f} ms")
+            print(f"   max: {stats['max_ms']:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
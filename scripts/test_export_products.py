@@ -0,0 +1,77 @@
+"""
+Tests für den inkrementellen Export (export_products.merge_incremental)
+fetch_pages wird durch feste Seiten ersetzt, geschrieben wird als CSV
+"""
+
+import json
+
+import export_products
+
+
+COLUMNS = list(export_products.PRODUCT_COLUMN_TYPES)
+
+
+def _row(product_id, name, updated_at):
+    return {'id': product_id, 'vysn_name': name, 'item_number_vysn': f"V{product_id}",
+            'cct_values': [2700, 3000], 'updated_at': updated_at}
+
+
+def _stub_fetch_pages(monkeypatch, pages):
+    calls = []
+
+    def fetch_pages(columns, since=None, page_size=None, workers=None):
+        calls.append({'columns': columns, 'since': since})
+        return iter(pages)
+
+    monkeypatch.setattr(export_products, 'fetch_pages', fetch_pages)
+    return calls
+
+
+def test_full_export_then_incremental_updates_and_appends(tmp_path, monkeypatch):
+    output = str(tmp_path / 'products.csv')
+
+    _stub_fetch_pages(monkeypatch, [[
+        _row(1, 'Tevo', '2025-01-01T10:00:00+00:00'),
+        _row(2, 'Nydle', '2025-01-01T11:00:00+00:00'),
+    ]])
+    _, watermark = export_products.export_products(output, COLUMNS)
+    export_products._save_state(output, COLUMNS, watermark)
+
+    # Gleiche Spalten wie im vollen Export, aber in der Reihenfolge aus main(--incremental)
+    incremental_columns = ['id', 'updated_at'] + [c for c in COLUMNS if c not in ('id', 'updated_at')]
+    calls = _stub_fetch_pages(monkeypatch, [[
+        _row(2, 'Nydle v2', '2025-02-01T09:00:00+00:00'),
+        _row(3, 'Sass', '2025-02-01T09:30:00+00:00'),
+    ]])
+    changed, watermark = export_products.merge_incremental(output, incremental_columns)
+
+    assert changed == 2
+    assert watermark == '2025-02-01T09:30:00+00:00'
+    assert calls[0]['since'] == '2025-01-01T11:00:00+00:00'
+
+    rows = export_products.read_export(output)
+    assert [(r['id'], r['vysn_name']) for r in rows] == [(1, 'Tevo'), (2, 'Nydle v2'), (3, 'Sass')]
+    assert rows[2]['cct_values'] == [2700, 3000]
+
+    # Datei und Status behalten die Reihenfolge des ersten Exports
+    with open(output, encoding='utf-8') as f:
+        assert f.readline().strip().split(',') == COLUMNS
+    with open(output + '.state.json', encoding='utf-8') as f:
+        state = json.load(f)
+    assert state['columns'] == COLUMNS
+    assert state['watermark'] == watermark
+
+
+def test_incremental_rejects_different_column_selection(tmp_path, monkeypatch):
+    output = str(tmp_path / 'products.csv')
+    columns = ['id', 'vysn_name', 'updated_at']
+    _stub_fetch_pages(monkeypatch, [[_row(1, 'Tevo', '2025-01-01T10:00:00+00:00')]])
+    _, watermark = export_products.export_products(output, columns)
+    export_products._save_state(output, columns, watermark)
+
+    try:
+        export_products.merge_incremental(output, ['id', 'gross_price', 'updated_at'])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("abweichende Spaltenauswahl muss abgelehnt werden")
@@ -11,6 +11,7 @@ from datetime import datetime
 import numpy as np
 import sys
 from dotenv import load_dotenv
+from scripts.profiling import profile_requested, enable_profiling, profile_stage
 
 # Lade .env Datei
 load_dotenv()
@@ -38,6 +39,8 @@ def clean_value(value):
     return value
 
 def main():
+    if profile_requested():
+        enable_profiling('update_stock_from_excel')
     try:
         print("📊 Starte Lagerbestand-Update aus Excel-Datei...")
         
@@ -52,18 +55,20 @@ def main():
             sys.exit(1)
             
         print(f"📖 Lade Excel-Datei: {excel_file}")
-        df = pd.read_excel(excel_file)
+        with profile_stage('read_excel'):
+            df = pd.read_excel(excel_file)
         
         # Extrahiere relevante Spalten (Nr. = Artikelnummer, Lagerbestand = Stock)
-        stock_data = df[['Nr.', 'Lagerbestand']].copy()
-        stock_data.columns = ['artikel_nr', 'lagerbestand']
-        
-        # Bereinige Daten
-        stock_data['artikel_nr'] = stock_data['artikel_nr'].astype(str).str.strip()
-        stock_data['lagerbestand'] = pd.to_numeric(stock_data['lagerbestand'], errors='coerce').fillna(0)
-        
-        # Entferne leere Artikelnummern
-        stock_data = stock_data[stock_data['artikel_nr'].notna() & (stock_data['artikel_nr'] != '') & (stock_data['artikel_nr'] != 'nan')]
+        with profile_stage('clean'):
+            stock_data = df[['Nr.', 'Lagerbestand']].copy()
+            stock_data.columns = ['artikel_nr', 'lagerbestand']
+            
+            # Bereinige Daten
+            stock_data['artikel_nr'] = stock_data['artikel_nr'].astype(str).str.strip()
+            stock_data['lagerbestand'] = pd.to_numeric(stock_data['lagerbestand'], errors='coerce').fillna(0)
+            
+            # Entferne leere Artikelnummern
+            stock_data = stock_data[stock_data['artikel_nr'].notna() & (stock_data['artikel_nr'] != '') & (stock_data['artikel_nr'] != 'nan')]
         
         print(f"📋 Gefunden: {len(stock_data)} Artikel mit Lagerbeständen")
         print(f"📊 Lagerbestand-Statistik:")
@@ -73,64 +78,74 @@ def main():
         
         # Hole aktuelle Produkte aus Supabase
         print("🔍 Lade aktuelle Produkte aus Supabase...")
-        result = supabase.table('products').select('id, item_number_vysn, stock_quantity').execute()
+        with profile_stage('fetch_products'):
+            result = supabase.table('products').select('id, item_number_vysn, stock_quantity').execute()
         
         if not result.data:
             print("❌ Keine Produkte in der Datenbank gefunden!")
             sys.exit(1)
             
-        products_df = pd.DataFrame(result.data)
-        print(f"📦 Gefunden: {len(products_df)} Produkte in der Datenbank")
+        # Artikelnummer -> Produkt; erstes Vorkommen gewinnt (item_number_vysn ist UNIQUE)
+        products_by_item_number = {}
+        for product in result.data:
+            products_by_item_number.setdefault(product['item_number_vysn'], product)
+        print(f"📦 Gefunden: {len(result.data)} Produkte in der Datenbank")
         
         # Führe SVERWEIS-ähnlichen Abgleich durch
         print("🔄 Führe Artikelabgleich durch (wie SVERWEIS)...")
         
-        updates_count = 0
-        not_found_count = 0
-        no_change_count = 0
-        pro_articles_count = 0
-        
-        for _, excel_row in stock_data.iterrows():
-            artikel_nr = excel_row['artikel_nr']
-            new_stock = int(excel_row['lagerbestand'])
-            
-            # Spezialbehandlung für PRO-Artikel: Setze auf -1 für "auf Anfrage"
-            if artikel_nr.startswith('PRO-'):
-                new_stock = -1  # Spezialwert für "auf Anfrage"
-                pro_articles_count += 1
-            
-            # Suche passendes Produkt in der Datenbank
-            matching_products = products_df[products_df['item_number_vysn'] == artikel_nr]
-            
-            if matching_products.empty:
-                not_found_count += 1
-                continue
-            
-            # Nimm das erste Match (sollte eindeutig sein wegen UNIQUE constraint)
-            product = matching_products.iloc[0]
-            current_stock = product.get('stock_quantity', 0) or 0
+        with profile_stage('match'):
+            pending_updates = []
+            not_found_articles = []
+            no_change_count = 0
+            pro_articles_count = 0
             
-            # Überspringe wenn sich nichts ändert
-            if current_stock == new_stock:
-                no_change_count += 1
-                continue
-            
-            # Update in Supabase
-            try:
-                update_result = supabase.table('products').update({
-                    'stock_quantity': new_stock,
-                    'updated_at': datetime.now().isoformat()
-                }).eq('id', product['id']).execute()
+            for artikel_nr, lagerbestand in zip(stock_data['artikel_nr'], stock_data['lagerbestand']):
+                new_stock = int(lagerbestand)
+                
+                # Spezialbehandlung für PRO-Artikel: Setze auf -1 für "auf Anfrage"
+                if artikel_nr.startswith('PRO-'):
+                    new_stock = -1  # Spezialwert für "auf Anfrage"
+                    pro_articles_count += 1
+                
+                # Suche passendes Produkt in der Datenbank
+                product = products_by_item_number.get(artikel_nr)
+                if product is None:
+                    not_found_articles.append(artikel_nr)
+                    continue
+                
+                current_stock = product.get('stock_quantity', 0) or 0
                 
-                if update_result.data:
-                    updates_count += 1
-                    if updates_count <= 10:  # Zeige nur erste 10 Updates
-                        status = "auf Anfrage" if new_stock == -1 else str(new_stock)
-                        current_status = "auf Anfrage" if current_stock == -1 else str(current_stock)
-                        print(f"   ✅ {artikel_nr}: {current_status} → {status}")
-                        
-            except Exception as e:
-                print(f"   ❌ Fehler bei {artikel_nr}: {e}")
+                # Überspringe wenn sich nichts ändert
+                if current_stock == new_stock:
+                    no_change_count += 1
+                    continue
+                
+                pending_updates.append((artikel_nr, product['id'], current_stock, new_stock))
+        
+        not_found_count = len(not_found_articles)
+        print(f"📝 {len(pending_updates)} Lagerbestände zu aktualisieren")
+        
+        with profile_stage('http'):
+            updates_count = 0
+            
+            for artikel_nr, product_id, current_stock, new_stock in pending_updates:
+                # Update in Supabase
+                try:
+                    update_result = supabase.table('products').update({
+                        'stock_quantity': new_stock,
+                        'updated_at': datetime.now().isoformat()
+                    }).eq('id', product_id).execute()
+                    
+                    if update_result.data:
+                        updates_count += 1
+                        if updates_count <= 10:  # Zeige nur erste 10 Updates
+                            status = "auf Anfrage" if new_stock == -1 else str(new_stock)
+                            current_status = "auf Anfrage" if current_stock == -1 else str(current_stock)
+                            print(f"   ✅ {artikel_nr}: {current_status} → {status}")
+                            
+                except Exception as e:
+                    print(f"   ❌ Fehler bei {artikel_nr}: {e}")
         
         # Zusammenfassung
         print(f"\n📊 Update-Zusammenfassung:")
@@ -150,13 +165,7 @@ def main():
         # Zeige einige Beispiele der nicht gefundenen Artikel
         if not_found_count > 0:
             print(f"\n🔍 Beispiele nicht gefundener Artikel:")
-            not_found_examples = []
-            for _, excel_row in stock_data.iterrows():
-                artikel_nr = excel_row['artikel_nr']
-                if products_df[products_df['item_number_vysn'] == artikel_nr].empty:
-                    not_found_examples.append(artikel_nr)
-                    if len(not_found_examples) >= 5:
-                        break
+            not_found_examples = not_found_articles[:5]
             
             for example in not_found_examples:
                 print(f"   - {example}")